@@ -1,33 +1,412 @@
 #!/usr/bin/env python3
 import json
+import gzip
+import sqlite3
+import ipaddress
 from pathlib import Path
 from collections import Counter
 import datetime
 import argparse
 
 
+NS_PER_SECOND = 1_000_000_000
+NS_PER_MINUTE = 60 * NS_PER_SECOND
+NS_PER_HOUR = 3600 * NS_PER_SECOND
+
+ROLLUP_DB = "honeypot_rollups.db"
+# bump whenever the rollup tables change; rollups are derived, so an old db is rebuilt
+ROLLUP_SCHEMA_VERSION = 2
+GRANULARITY_MINUTES = {"minute": 1, "hour": 60, "day": 1440}
+GRANULARITY_FORMATS = {"minute": "%Y-%m-%d %H:%M", "hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d"}
+GROUP_FIELDS = ("service", "port", "ip")
+# every real-world UTC offset is a multiple of 15 minutes, so 15-minute slots
+# can always be mapped onto local hour/day buckets
+SLOT_MINUTES = 15
+
+EXPORT_COLUMNS = [
+    'ts', 'timestamp', 'sensor', 'service', 'attacker_ip', 'port', 'data',
+    'session_id', 'bytes_in', 'bytes_out', 'duration_ns', 'close_reason'
+]
+
+_utc_offsets = {}
+_networks = {}
+
+
+def timestamp_ns(text):
+    return int(datetime.datetime.strptime(text, "%Y-%m-%d %H:%M:%S").timestamp()) * NS_PER_SECOND
+
+
+def event_ns(event):
+    ts = event.get('ts')
+    if ts is None:
+        # schema v1 events only carry a local "YYYY-MM-DD HH:MM:SS" string
+        ts = timestamp_ns(event['timestamp'])
+    return ts
+
+
+def utc_offset_ns(ts):
+    # local UTC offset only changes on hour boundaries, so look it up once per hour
+    bucket = ts // NS_PER_HOUR
+    offset = _utc_offsets.get(bucket)
+    if offset is None:
+        local = datetime.datetime.fromtimestamp(bucket * 3600).astimezone()
+        offset = int(local.utcoffset().total_seconds()) * NS_PER_SECOND
+        _utc_offsets[bucket] = offset
+    return offset
+
+
+def event_hour(event):
+    ts = event.get('ts')
+    if ts is None:
+        return int(event['timestamp'][11:13])
+    return (ts + utc_offset_ns(ts)) // NS_PER_HOUR % 24
+
+
+def time_bucket(minute, granularity):
+    local = minute + utc_offset_ns(minute * NS_PER_MINUTE) // NS_PER_MINUTE
+    bucket = local - local % GRANULARITY_MINUTES[granularity]
+    return datetime.datetime.fromtimestamp(bucket * 60, datetime.timezone.utc).strftime(GRANULARITY_FORMATS[granularity])
+
+
+def ip_matches(ip, pattern):
+    if '/' not in pattern:
+        return ip == pattern
+    
+    network = _networks.get(pattern)
+    if network is None:
+        network = _networks[pattern] = ipaddress.ip_network(pattern, strict=False)
+    try:
+        return ipaddress.ip_address(ip) in network
+    except ValueError:
+        return False
+
+
 class LogAnalyzer:
     
-    def __init__(self, log_dir="logs"):
+    def __init__(self, log_dir="logs", load=True):
         self.log_dir = Path(log_dir)
         self.attacks = []
-        self.load_logs()
+        if load:
+            self.load_logs()
     
-    def load_logs(self):
+    def log_files(self, start=None):
+        files = []
+        
         json_log = self.log_dir / "honeypot_events.json"
+        if json_log.exists():
+            files.append(json_log)
+        
+        # partitions written by collector.py: collected/<day>/<sensor>.json, named by
+        # arrival day. Spooled events can arrive days late, so only days before
+        # the start of the range can be skipped.
+        for path in sorted((self.log_dir / "collected").glob("*/*.json")):
+            if start and path.parent.name < start[:10]:
+                continue
+            files.append(path)
+        
+        return files
+    
+    def iter_attacks(self, start=None, end=None, service=None, ip=None):
+        # v2 events are compared on ts; the range covers whole seconds like the v1 strings
+        start_ns = timestamp_ns(start) if start else None
+        end_ns = timestamp_ns(end) + NS_PER_SECOND if end else None
+        
+        for path in self.log_files(start):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    # cheap substring checks before paying for json.loads
+                    if '"ALERT"' not in line:
+                        continue
+                    if service and service not in line:
+                        continue
+                    if ip and ip not in line:
+                        continue
+                    
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    
+                    if event.get("level") != "ALERT":
+                        continue
+                    
+                    ts = event.get('ts')
+                    if ts is None:
+                        if start and event['timestamp'] < start:
+                            continue
+                        if end and event['timestamp'] > end:
+                            continue
+                    else:
+                        if start_ns is not None and ts < start_ns:
+                            continue
+                        if end_ns is not None and ts >= end_ns:
+                            continue
+                    if service and event['data']['service'] != service:
+                        continue
+                    if ip and event['data']['attacker_ip'] != ip:
+                        continue
+                    
+                    yield event
+    
+    def load_logs(self):
+        files = self.log_files()
+        
+        if not files:
+            print(f"Log file not found: {self.log_dir / 'honeypot_events.json'}")
+            return
+        
+        self.attacks.extend(self.iter_attacks())
+        
+        if len(files) > 1:
+            self.attacks.sort(key=lambda attack: (attack['timestamp'], attack.get('ts', 0)))
+    
+    def open_rollups(self):
+        # concurrent queries queue on the rollup write lock while one of them catches up
+        db = sqlite3.connect(self.log_dir / ROLLUP_DB, timeout=60)
+        if db.execute("PRAGMA user_version").fetchone()[0] != ROLLUP_SCHEMA_VERSION:
+            db.executescript(f"""
+                DROP TABLE IF EXISTS minute_rollups;
+                DROP TABLE IF EXISTS rollup_ips;
+                DROP TABLE IF EXISTS rollup_offsets;
+                PRAGMA user_version = {ROLLUP_SCHEMA_VERSION};
+            """)
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS minute_rollups (
+                minute INTEGER NOT NULL,
+                service TEXT NOT NULL,
+                port INTEGER NOT NULL,
+                ip TEXT NOT NULL,
+                attacks INTEGER NOT NULL,
+                bytes_in INTEGER NOT NULL,
+                bytes_out INTEGER NOT NULL,
+                PRIMARY KEY (minute, service, port, ip)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS rollup_ips (
+                ip TEXT PRIMARY KEY
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS rollup_offsets (
+                path TEXT PRIMARY KEY,
+                inode INTEGER NOT NULL,
+                offset INTEGER NOT NULL
+            );
+        """)
+        return db
+    
+    def update_rollups(self, db):
+        # offsets are read, the new lines folded in and the offsets advanced under one write
+        # lock; otherwise two concurrent queries could both count the same appended lines
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            known = {
+                path: (inode, offset)
+                for path, inode, offset in db.execute("SELECT path, inode, offset FROM rollup_offsets")
+            }
+            files = {path.relative_to(self.log_dir).as_posix(): path for path in self.log_files()}
+            stats = {rel: path.stat() for rel, path in files.items()}
+            offsets = {rel: offset for rel, (inode, offset) in known.items()}
+            
+            # a log that was replaced or shrank was rotated or truncated; its old counts can't be
+            # subtracted, so start over. A rotated file that already grew past the old offset
+            # only shows up as a new inode.
+            if any(
+                rel in known and (stats[rel].st_ino != known[rel][0] or stats[rel].st_size < known[rel][1])
+                for rel in files
+            ):
+                db.execute("DELETE FROM minute_rollups")
+                db.execute("DELETE FROM rollup_ips")
+                db.execute("DELETE FROM rollup_offsets")
+                offsets = {}
+            
+            rollups = {}
+            for rel, path in files.items():
+                offset = offsets.get(rel, 0)
+                
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break  # the writer is mid-line, pick it up next time
+                        offset += len(line)
+                        
+                        if b'"ALERT"' not in line:
+                            continue
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            continue
+                        if event.get("level") != "ALERT":
+                            continue
+                        
+                        data = event['data']
+                        key = (event_ns(event) // NS_PER_MINUTE, data['service'], data['port'], data['attacker_ip'])
+                        row = rollups.get(key)
+                        if row is None:
+                            row = rollups[key] = [0, 0, 0]
+                        row[0] += 1
+                        row[1] += data.get('bytes_in', 0)
+                        row[2] += data.get('bytes_out', 0)
+                
+                offsets[rel] = offset
+            
+            db.executemany(
+                """INSERT INTO minute_rollups VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (minute, service, port, ip) DO UPDATE SET
+                       attacks = attacks + excluded.attacks,
+                       bytes_in = bytes_in + excluded.bytes_in,
+                       bytes_out = bytes_out + excluded.bytes_out""",
+                (key + tuple(row) for key, row in rollups.items())
+            )
+            db.executemany("INSERT OR IGNORE INTO rollup_ips VALUES (?)", {(key[3],) for key in rollups})
+            db.executemany(
+                "INSERT OR REPLACE INTO rollup_offsets VALUES (?, ?, ?)",
+                ((rel, stats[rel].st_ino, offset) for rel, offset in offsets.items() if rel in stats)
+            )
+        
+        return sum(row[0] for row in rollups.values())
+    
+    def query(self, start=None, end=None, service=None, port=None, ip=None, payload=None,
+              group_by=(), granularity=None):
+        for field in group_by:
+            if field not in GROUP_FIELDS:
+                raise ValueError(f"Cannot group by {field!r}, choose from {', '.join(GROUP_FIELDS)}")
+        if granularity is not None and granularity not in GRANULARITY_MINUTES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        if ip and '/' in ip:
+            ipaddress.ip_network(ip, strict=False)
+        # rollups only resolve whole minutes; bounds inside a minute would give a
+        # different answer than the same query with a payload
+        if start and timestamp_ns(start) % NS_PER_MINUTE:
+            raise ValueError(f'Query start must be on a whole minute ("HH:MM:00"), got {start!r}')
+        if end and timestamp_ns(end) % NS_PER_MINUTE != NS_PER_MINUTE - NS_PER_SECOND:
+            raise ValueError(f'Query end must close a whole minute ("HH:MM:59"), got {end!r}')
+        
+        # rollups have no payloads, so payload searches fall back to scanning raw events
+        if payload:
+            return self._query_events(start, end, service, port, ip, payload, group_by, granularity)
+        
+        db = self.open_rollups()
+        try:
+            self.update_rollups(db)
+            return self._query_rollups(db, start, end, service, port, ip, group_by, granularity)
+        finally:
+            db.close()
+    
+    def _query_rollups(self, db, start, end, service, port, ip, group_by, granularity):
+        columns = list(group_by)
+        where = []
+        params = []
         
-        if not json_log.exists():
-            print(f"Log file not found: {json_log}")
+        if ip and '/' in ip:
+            # match the CIDR against the few distinct IPs once, not against every rollup row
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS query_ips (ip TEXT PRIMARY KEY)")
+            db.execute("DELETE FROM query_ips")
+            db.executemany(
+                "INSERT INTO query_ips VALUES (?)",
+                ((known,) for (known,) in db.execute("SELECT ip FROM rollup_ips").fetchall() if ip_matches(known, ip))
+            )
+            where.append("ip IN (SELECT ip FROM query_ips)")
+        elif ip:
+            where.append("ip = ?")
+            params.append(ip)
+        
+        if start:
+            where.append("minute >= ?")
+            params.append(timestamp_ns(start) // NS_PER_MINUTE)
+        if end:
+            where.append("minute <= ?")
+            params.append(timestamp_ns(end) // NS_PER_MINUTE)
+        if service:
+            where.append("service = ?")
+            params.append(service)
+        if port is not None:
+            where.append("port = ?")
+            params.append(port)
+        
+        # SQL groups by whole UTC slots; slots are mapped to local buckets below
+        slot = 1 if granularity == "minute" else SLOT_MINUTES
+        select = [f"minute / {slot}"] if granularity else []
+        select += columns
+        
+        sql = f"SELECT {', '.join(select + ['SUM(attacks)', 'SUM(bytes_in)', 'SUM(bytes_out)'])} FROM minute_rollups"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if select:
+            sql += f" GROUP BY {', '.join(select)}"
+        
+        totals = {}
+        labels = {}
+        for row in db.execute(sql, params):
+            if row[-3] is None:
+                continue
+            key = row[:-3]
+            if granularity:
+                label = labels.get(key[0])
+                if label is None:
+                    label = labels[key[0]] = time_bucket(key[0] * slot, granularity)
+                key = (label,) + key[1:]
+            
+            total = totals.get(key)
+            if total is None:
+                total = totals[key] = [0, 0, 0]
+            total[0] += row[-3]
+            total[1] += row[-2]
+            total[2] += row[-1]
+        
+        return self._build_rows(totals, group_by, granularity)
+    
+    def _query_events(self, start, end, service, port, ip, payload, group_by, granularity):
+        exact_ip = ip if ip and '/' not in ip else None
+        totals = {}
+        
+        for attack in self.iter_attacks(start=start, end=end, service=service, ip=exact_ip):
+            data = attack['data']
+            if payload not in data['data']:
+                continue
+            if port is not None and data['port'] != port:
+                continue
+            if ip and not exact_ip and not ip_matches(data['attacker_ip'], ip):
+                continue
+            
+            values = {"service": data['service'], "port": data['port'], "ip": data['attacker_ip']}
+            key = tuple(values[field] for field in group_by)
+            if granularity:
+                key = (time_bucket(event_ns(attack) // NS_PER_MINUTE, granularity),) + key
+            
+            row = totals.get(key)
+            if row is None:
+                row = totals[key] = [0, 0, 0]
+            row[0] += 1
+            row[1] += data.get('bytes_in', 0)
+            row[2] += data.get('bytes_out', 0)
+        
+        return self._build_rows(totals, group_by, granularity)
+    
+    def _build_rows(self, totals, group_by, granularity):
+        columns = (["bucket"] if granularity else []) + list(group_by)
+        rows = []
+        for key, (attacks, bytes_in, bytes_out) in totals.items():
+            result = dict(zip(columns, key))
+            result.update(attacks=attacks, bytes_in=bytes_in, bytes_out=bytes_out)
+            rows.append(result)
+        
+        rows.sort(key=lambda row: -row['attacks'])
+        rows.sort(key=lambda row: row.get('bucket', ''))
+        return rows
+    
+    def print_query(self, rows):
+        print("\n" + "="*70)
+        print(f"QUERY RESULTS ({len(rows)} rows)")
+        print("="*70)
+        
+        if not rows:
+            print("\nNo matching attacks.")
             return
         
-        with open(json_log, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    event = json.loads(line)
-                    if event.get("level") == "ALERT":
-                        self.attacks.append(event)
-                except:
-                    pass
+        columns = list(rows[0].keys())
+        widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns}
+        print("\n   " + "  ".join(f"{column:{widths[column]}}" for column in columns).rstrip())
+        for row in rows:
+            print("   " + "  ".join(f"{str(row[column]):{widths[column]}}" for column in columns).rstrip())
     
     def print_summary(self):
         print("\n" + "="*70)
@@ -50,10 +429,7 @@ class LogAnalyzer:
         for ip, count in ip_counts.most_common(10):
             print(f"   • {ip:15} : {count} attacks")
         
-        hours = Counter(
-            datetime.datetime.strptime(attack['timestamp'], "%Y-%m-%d %H:%M:%S").hour
-            for attack in self.attacks
-        )
+        hours = Counter(event_hour(attack) for attack in self.attacks)
         print("\nAttacks by Hour:")
         for hour in sorted(hours.keys()):
             bar = "█" * min(hours[hour], 50)
@@ -71,6 +447,9 @@ class LogAnalyzer:
             print(f"   IP        : {data['attacker_ip']}")
             print(f"   Port      : {data['port']}")
             print(f"   Data      : {data['data'][:100]}...")
+            if 'session_id' in data:
+                print(f"   Session   : {data['session_id']} ({data['bytes_in']} B in, {data['bytes_out']} B out, "
+                      f"{data['duration_ns'] / NS_PER_SECOND:.3f}s, {data['close_reason']})")
     
     def export_to_csv(self, output_file="honeypot_report.csv"):
         import csv
@@ -93,6 +472,106 @@ class LogAnalyzer:
         
         print(f"\nCSV report created: {output_path}")
     
+    def export_columnar(self, output_file=None, fmt="parquet", row_group_size=65536,
+                        dictionary=True, start=None, end=None, service=None, ip=None):
+        if fmt not in ("parquet", "arrow", "ndjson"):
+            raise ValueError(f"Unknown export format: {fmt}")
+        
+        if output_file is None:
+            output_file = "honeypot_report" if fmt == "ndjson" else f"honeypot_report.{fmt}"
+        output_path = self.log_dir / output_file
+        
+        attacks = self.iter_attacks(start=start, end=end, service=service, ip=ip)
+        if fmt == "ndjson":
+            rows = self._export_ndjson_chunks(attacks, output_path, row_group_size)
+        else:
+            rows = self._export_arrow(attacks, output_path, fmt, row_group_size, dictionary)
+        
+        print(f"\n{fmt.upper()} export created: {output_path} ({rows} attacks)")
+        return rows
+    
+    def _row_groups(self, attacks, row_group_size):
+        columns = {name: [] for name in EXPORT_COLUMNS}
+        
+        for attack in attacks:
+            data = attack['data']
+            columns['ts'].append(event_ns(attack))
+            columns['timestamp'].append(attack['timestamp'])
+            columns['sensor'].append(attack.get('sensor'))
+            columns['service'].append(data['service'])
+            columns['attacker_ip'].append(data['attacker_ip'])
+            columns['port'].append(data['port'])
+            columns['data'].append(data['data'])
+            columns['session_id'].append(data.get('session_id'))
+            columns['bytes_in'].append(data.get('bytes_in'))
+            columns['bytes_out'].append(data.get('bytes_out'))
+            columns['duration_ns'].append(data.get('duration_ns'))
+            columns['close_reason'].append(data.get('close_reason'))
+            
+            if len(columns['timestamp']) >= row_group_size:
+                yield columns
+                columns = {name: [] for name in EXPORT_COLUMNS}
+        
+        if columns['timestamp']:
+            yield columns
+    
+    def _export_arrow(self, attacks, output_path, fmt, row_group_size, dictionary):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError(f"{fmt} export requires pyarrow (pip install pyarrow); use --export-format ndjson instead")
+        
+        text = pa.dictionary(pa.int32(), pa.string()) if dictionary else pa.string()
+        schema = pa.schema([
+            ('ts', pa.timestamp('ns', tz='UTC')),
+            ('timestamp', pa.string()),
+            ('sensor', text),
+            ('service', text),
+            ('attacker_ip', text),
+            ('port', pa.int32()),
+            ('data', pa.string()),
+            ('session_id', pa.string()),
+            ('bytes_in', pa.int64()),
+            ('bytes_out', pa.int64()),
+            ('duration_ns', pa.int64()),
+            ('close_reason', text),
+        ])
+        
+        if fmt == "parquet":
+            writer = pq.ParquetWriter(output_path, schema, compression="zstd", use_dictionary=dictionary)
+        else:
+            writer = pa.ipc.new_file(output_path, schema)
+        
+        rows = 0
+        try:
+            for columns in self._row_groups(attacks, row_group_size):
+                batch = pa.RecordBatch.from_pydict(columns, schema=schema)
+                if fmt == "parquet":
+                    writer.write_batch(batch, row_group_size=row_group_size)
+                else:
+                    writer.write_batch(batch)
+                rows += batch.num_rows
+        finally:
+            writer.close()
+        
+        return rows
+    
+    def _export_ndjson_chunks(self, attacks, output_path, row_group_size):
+        output_path.mkdir(parents=True, exist_ok=True)
+        for old_chunk in output_path.glob("part-*.ndjson.gz"):
+            old_chunk.unlink()
+        
+        rows = 0
+        for index, columns in enumerate(self._row_groups(attacks, row_group_size)):
+            chunk = output_path / f"part-{index:05d}.ndjson.gz"
+            with gzip.open(chunk, "wt", encoding="utf-8", compresslevel=1) as f:
+                for row in zip(*(columns[name] for name in EXPORT_COLUMNS)):
+                    f.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, separators=(',', ':')) + "\n")
+            rows += len(columns['timestamp'])
+        
+        return rows
+    
     def get_statistics(self):
         if not self.attacks:
             return {}
@@ -127,11 +606,70 @@ def main():
     parser.add_argument('--export-csv', action='store_true', help='Export CSV report')
     parser.add_argument('--detailed', action='store_true', help='Show detailed attacks')
     parser.add_argument('--limit', type=int, default=20, help='Max attacks to show')
+    parser.add_argument('--export-format', choices=['parquet', 'arrow', 'ndjson'],
+                        help='Stream a columnar export (parquet/arrow need pyarrow)')
+    parser.add_argument('--export-output', help='Export file (or directory for ndjson chunks)')
+    parser.add_argument('--row-group-size', type=int, default=65536, help='Rows per row group / chunk')
+    parser.add_argument('--no-dictionary', action='store_true', help='Disable dictionary encoding of sensor/service/IP')
+    parser.add_argument('--export-only', action='store_true', help='Only run the export, skip the report')
+    parser.add_argument('--since', help='Export attacks at or after "YYYY-MM-DD HH:MM:SS"')
+    parser.add_argument('--until', help='Export attacks at or before "YYYY-MM-DD HH:MM:SS"')
+    parser.add_argument('--service', help='Export/query only this service (e.g. SSH)')
+    parser.add_argument('--ip', help='Export only this attacker IP; queries also accept a CIDR')
+    parser.add_argument('--query', action='store_true', help='Answer a query from the rollups instead of the report')
+    parser.add_argument('--port', type=int, help='Query only this port')
+    parser.add_argument('--payload', help='Query only attacks whose data contains this text (scans raw events)')
+    parser.add_argument('--group-by', default='', help='Comma-separated: service, port, ip')
+    parser.add_argument('--granularity', choices=['minute', 'hour', 'day'], help='Time bucket for queries')
     
     args = parser.parse_args()
+    for flag, bound in (("--since", args.since), ("--until", args.until)):
+        if bound:
+            try:
+                timestamp_ns(bound)
+            except ValueError:
+                parser.error(f'{flag} must look like "YYYY-MM-DD HH:MM:SS", got {bound!r}')
     
     print_banner()
     
+    if args.export_format:
+        exporter = LogAnalyzer(log_dir=args.log_dir, load=False)
+        try:
+            exporter.export_columnar(
+                output_file=args.export_output,
+                fmt=args.export_format,
+                row_group_size=args.row_group_size,
+                dictionary=not args.no_dictionary,
+                start=args.since,
+                end=args.until,
+                service=args.service,
+                ip=args.ip
+            )
+        except RuntimeError as e:
+            print(f"\nExport failed: {e}")
+        
+        if args.export_only:
+            return
+    
+    if args.query:
+        engine = LogAnalyzer(log_dir=args.log_dir, load=False)
+        try:
+            rows = engine.query(
+                start=args.since,
+                end=args.until,
+                service=args.service,
+                port=args.port,
+                ip=args.ip,
+                payload=args.payload,
+                group_by=[field.strip() for field in args.group_by.split(',') if field.strip()],
+                granularity=args.granularity
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        engine.print_query(rows)
+        print("\n")
+        return
+    
     analyzer = LogAnalyzer(log_dir=args.log_dir)
     
     analyzer.print_summary()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+import os
+import socket
+import threading
+import datetime
+import zlib
+from pathlib import Path
+import argparse
+
+from honeypot import (
+    SHIP_MAGIC, SHIP_HELLO, SHIP_BATCH, SHIP_ACK, SENSOR_ID_RE, SPOOL_EPOCH_RE,
+    recv_exact, write_durable, fsync_dir
+)
+
+
+MAX_BATCH_BYTES = 64 * 1024 * 1024
+
+
+class SensorStore:
+    
+    def __init__(self, store_dir, sensor_id):
+        self.store_dir = Path(store_dir)
+        self.sensor_id = sensor_id
+        self.lock = threading.Lock()
+        
+        self.state_dir = self.store_dir / "_state"
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.last_seqs = {}
+        
+        self.day = None
+        self.file = None
+        self.closed = False
+    
+    def _partition(self):
+        day = datetime.date.today().isoformat()
+        if day != self.day:
+            if self.file:
+                self.file.close()
+            partition = self.store_dir / day
+            partition.mkdir(parents=True, exist_ok=True)
+            self.file = open(partition / f"{self.sensor_id}.json", "ab")
+            fsync_dir(partition)
+            self.day = day
+        return self.file
+    
+    def _state_file(self, epoch):
+        return self.state_dir / f"{self.sensor_id}.{epoch}.seq"
+    
+    def _last_seq(self, epoch):
+        last_seq = self.last_seqs.get(epoch)
+        if last_seq is None:
+            state_file = self._state_file(epoch)
+            last_seq = int(state_file.read_text().strip() or 0) if state_file.exists() else 0
+            self.last_seqs[epoch] = last_seq
+        return last_seq
+    
+    def write_batch(self, epoch, seq, payload):
+        with self.lock:
+            if self.closed:
+                raise OSError(f"store for {self.sensor_id} is closed")
+            
+            # a resend of a batch whose ack got lost; the sensor's spool epoch
+            # changes whenever its seqs restart, so this is never new data
+            if seq <= self._last_seq(epoch):
+                return 0
+            
+            events = zlib.decompress(payload)
+            f = self._partition()
+            f.write(events)
+            f.flush()
+            os.fsync(f.fileno())
+            
+            write_durable(self._state_file(epoch), str(seq).encode("ascii"))
+            self.last_seqs[epoch] = seq
+            return events.count(b"\n")
+    
+    def close(self):
+        with self.lock:
+            self.closed = True
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+class EventCollector:
+    
+    def __init__(self, store_dir="logs", host="0.0.0.0", port=9500):
+        self.store_dir = Path(store_dir) / "collected"
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.host = host
+        self.port = port
+        self.running = True
+        self.server = None
+        
+        self.sensors = {}
+        self.connections = {}
+        self.sensors_lock = threading.Lock()
+        self.events_received = 0
+        self.batches_received = 0
+        self.stats_lock = threading.Lock()
+    
+    def _get_store(self, sensor_id):
+        with self.sensors_lock:
+            store = self.sensors.get(sensor_id)
+            if store is None:
+                store = SensorStore(self.store_dir, sensor_id)
+                self.sensors[sensor_id] = store
+            return store
+    
+    def bind(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((self.host, self.port))
+        server.listen(128)
+        self.port = server.getsockname()[1]
+        self.server = server
+    
+    def start(self):
+        if self.server is None:
+            self.bind()
+        
+        print(f"Collector listening on {self.host}:{self.port}, store: {self.store_dir}")
+        
+        try:
+            while self.running:
+                try:
+                    client, address = self.server.accept()
+                except OSError:
+                    break
+                
+                thread = threading.Thread(
+                    target=self._handle_sensor,
+                    args=(client, address),
+                    daemon=True
+                )
+                with self.sensors_lock:
+                    if not self.running:
+                        client.close()
+                        break
+                    self.connections[client] = thread
+                thread.start()
+        finally:
+            self.server.close()
+    
+    def stop(self, timeout=5.0):
+        with self.sensors_lock:
+            self.running = False
+            connections = list(self.connections.items())
+        if self.server:
+            try:
+                self.server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.server.close()
+        
+        # handlers must be done writing before their stores close; an unacked
+        # batch cut off here is simply resent by the sensor
+        for client, _ in connections:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for _, thread in connections:
+            thread.join(timeout)
+        
+        with self.sensors_lock:
+            for store in self.sensors.values():
+                store.close()
+    
+    def _handle_sensor(self, client, address):
+        sensor_id = None
+        
+        try:
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            
+            if recv_exact(client, len(SHIP_MAGIC)) != SHIP_MAGIC:
+                return
+            sensor_length, epoch_length = SHIP_HELLO.unpack(recv_exact(client, SHIP_HELLO.size))
+            sensor_id = recv_exact(client, sensor_length).decode("ascii", errors="replace")
+            epoch = recv_exact(client, epoch_length).decode("ascii", errors="replace")
+            if not SENSOR_ID_RE.match(sensor_id) or not SPOOL_EPOCH_RE.match(epoch):
+                print(f"Rejected sensor {sensor_id!r} from {address[0]}")
+                sensor_id = None
+                return
+            
+            print(f"Sensor connected: {sensor_id} ({address[0]}, spool {epoch[:8]})")
+            store = self._get_store(sensor_id)
+            
+            while self.running:
+                try:
+                    header = recv_exact(client, SHIP_BATCH.size)
+                except ConnectionError:
+                    break
+                seq, length = SHIP_BATCH.unpack(header)
+                if length > MAX_BATCH_BYTES:
+                    print(f"Sensor {sensor_id} sent oversized batch ({length} bytes)")
+                    break
+                
+                count = store.write_batch(epoch, seq, recv_exact(client, length))
+                client.sendall(SHIP_ACK.pack(seq))
+                
+                with self.stats_lock:
+                    self.batches_received += 1
+                    self.events_received += count
+        
+        except (OSError, ConnectionError, zlib.error) as e:
+            print(f"Sensor {sensor_id or address[0]} error: {e}")
+        finally:
+            client.close()
+            with self.sensors_lock:
+                self.connections.pop(client, None)
+            if sensor_id:
+                print(f"Sensor disconnected: {sensor_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HoneyPot Event Collector')
+    parser.add_argument('--log-dir', default='logs', help='Store directory (readable by analyze_logs.py)')
+    parser.add_argument('--host', default='0.0.0.0', help='Listen address')
+    parser.add_argument('--port', type=int, default=9500, help='Listen port')
+    
+    args = parser.parse_args()
+    
+    collector = EventCollector(store_dir=args.log_dir, host=args.host, port=args.port)
+    
+    try:
+        collector.start()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+        collector.stop()
+
+
+if __name__ == "__main__":
+    main()
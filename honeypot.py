@@ -3,128 +3,815 @@ import socket
 import threading
 import datetime
 import json
+import math
 from pathlib import Path
 import argparse
+import os
+import queue
+import re
+import signal
+import struct
+import sys
+import time
+import uuid
+import zlib
+
+
+SHIP_MAGIC = b"HPS1"
+SHIP_HELLO = struct.Struct("!HH")
+SHIP_BATCH = struct.Struct("!QI")
+SHIP_ACK = struct.Struct("!Q")
+SENSOR_ID_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+SPOOL_EPOCH_RE = re.compile(r"^[0-9a-f]{32}$")
+# json.dumps with non-default options builds a new encoder on every call
+SHIP_ENCODER = json.JSONEncoder(ensure_ascii=False, check_circular=False)
+
+EVENT_SCHEMA_VERSION = 2
+
+
+class StageTimer:
+    
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.stats = {}
+    
+    def start(self):
+        return time.perf_counter_ns() if self.enabled else 0
+    
+    def stop(self, group, stage, started):
+        if started:
+            self.record(f"{group}.{stage}", time.perf_counter_ns() - started)
+    
+    def record(self, stage, elapsed):
+        with self.lock:
+            entry = self.stats.get(stage)
+            if entry is None:
+                self.stats[stage] = [1, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                if elapsed > entry[2]:
+                    entry[2] = elapsed
+    
+    def toggle(self):
+        with self.lock:
+            self.enabled = not self.enabled
+            if self.enabled:
+                self.stats = {}
+            return self.enabled
+    
+    def report(self):
+        with self.lock:
+            stats = sorted(self.stats.items(), key=lambda item: item[1][1], reverse=True)
+        
+        lines = [f"{'Stage':20} {'Count':>10} {'Total ms':>12} {'Avg us':>10} {'Max us':>10}"]
+        for stage, (count, total, worst) in stats:
+            lines.append(
+                f"{stage:20} {count:>10} {total / 1e6:>12.2f} {total / count / 1e3:>10.1f} {worst / 1e3:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+class StackSampler:
+    
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.counts = {}
+        self.running = False
+        self.thread = None
+    
+    def start(self):
+        self.counts = {}
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def stop(self, output_path):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+        
+        # collapsed stack format, ready for flamegraph.pl / speedscope
+        collapsed = {}
+        for stack, count in self.counts.items():
+            key = ";".join(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                for code in reversed(stack)
+            )
+            collapsed[key] = collapsed.get(key, 0) + count
+        
+        with open(output_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(collapsed.items()):
+                f.write(f"{stack} {count}\n")
+        return sum(collapsed.values())
+    
+    def _run(self):
+        own_ident = threading.get_ident()
+        
+        while self.running:
+            time.sleep(self.interval)
+            
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                
+                # code objects are hashable, so stacks are only formatted once in stop()
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                
+                key = tuple(stack)
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+
+STAGES = StageTimer()
+
+
+def write_durable(path, data):
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    fsync_dir(path.parent)
+
+
+def fsync_dir(path):
+    # makes a rename/create durable; directories can't be opened for fsync on Windows
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def recv_exact(sock, size):
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+class Session:
+    
+    def __init__(self, client, address, service=None):
+        self.client = client
+        self.ip = address[0]
+        self.service = service
+        self.protocol = service.protocol if service else "TCP"
+        self.session_id = uuid.uuid4().hex
+        self.started_ns = time.monotonic_ns()
+        self.ended_ns = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.close_reason = None
+    
+    def recv(self, size):
+        started = STAGES.start()
+        try:
+            data = self.client.recv(size)
+        except socket.timeout:
+            # treat an idle client like a hang-up so handlers still log what they captured
+            self.close_reason = self.close_reason or "timeout"
+            data = b""
+        STAGES.stop(self.protocol, "recv", started)
+        self.bytes_in += len(data)
+        if not data and self.close_reason is None:
+            self.close_reason = "shutdown" if self.service and self.service.aborting else "client_closed"
+        return data
+    
+    def send(self, data):
+        started = STAGES.start()
+        sent = self.client.send(data)
+        STAGES.stop(self.protocol, "send", started)
+        self.bytes_out += sent
+        return sent
+    
+    def close(self, reason="completed"):
+        if self.close_reason is None:
+            self.close_reason = reason
+        self.ended_ns = time.monotonic_ns()
+        self.client.close()
+        if STAGES.enabled:
+            STAGES.record(f"{self.protocol}.session", self.ended_ns - self.started_ns)
+    
+    def metrics(self):
+        ended_ns = self.ended_ns or time.monotonic_ns()
+        return {
+            "session_id": self.session_id,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "duration_ns": ended_ns - self.started_ns,
+            "close_reason": self.close_reason
+        }
+
+
+def close_reason_for(error):
+    if isinstance(error, socket.timeout):
+        return "timeout"
+    if isinstance(error, (ConnectionResetError, BrokenPipeError)):
+        return "client_reset"
+    return "error"
+
+
+class EventShipper:
+    
+    def __init__(self, host, port, spool_dir, sensor_id, batch_size=500, flush_interval=1.0,
+                 max_pending=100000):
+        if not SENSOR_ID_RE.match(sensor_id):
+            raise ValueError(f"Invalid sensor id: {sensor_id!r}")
+        
+        self.host = host
+        self.port = port
+        self.sensor_id = sensor_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_in_flight = 64
+        self.max_pending = max_pending
+        
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.seq_file = self.spool_dir / "next_seq"
+        self.epoch = self._load_epoch()
+        self.next_seq = self._load_seq()
+        
+        self.pending = []
+        self.dropped = 0
+        self.cond = threading.Condition()
+        self.running = False
+        self.sock = None
+        self.thread = None
+    
+    def _load_epoch(self):
+        # seqs restart at 1 whenever the spool is recreated, so the collector
+        # dedupes per (sensor, epoch) rather than per sensor id
+        epoch_file = self.spool_dir / "epoch"
+        if epoch_file.exists():
+            epoch = epoch_file.read_text().strip()
+            if SPOOL_EPOCH_RE.match(epoch):
+                return epoch
+        
+        epoch = uuid.uuid4().hex
+        write_durable(epoch_file, epoch.encode("ascii"))
+        return epoch
+    
+    def _load_seq(self):
+        next_seq = 1
+        if self.seq_file.exists():
+            next_seq = int(self.seq_file.read_text().strip() or 1)
+        for path in self.spool_dir.glob("*.batch"):
+            next_seq = max(next_seq, int(path.stem) + 1)
+        return next_seq
+    
+    def submit(self, entry):
+        line = SHIP_ENCODER.encode(dict(entry, sensor=self.sensor_id)) + "\n"
+        with self.cond:
+            if len(self.pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self.pending.append(line)
+            if len(self.pending) >= self.batch_size:
+                self.cond.notify()
+    
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def stop(self, timeout=10.0):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread:
+            self.thread.join(timeout)
+        self._disconnect()
+    
+    def _seal_pending(self):
+        with self.cond:
+            lines, self.pending = self.pending, []
+        
+        for start in range(0, len(lines), self.batch_size):
+            payload = zlib.compress("".join(lines[start:start + self.batch_size]).encode("utf-8"), 1)
+            seq = self.next_seq
+            
+            try:
+                # persist the counter first so a crash can never reuse a seq within this epoch
+                write_durable(self.seq_file, str(seq + 1).encode("ascii"))
+                write_durable(self.spool_dir / f"{seq:020d}.batch", payload)
+            except OSError:
+                # keep the unsealed events in memory and retry on the next tick
+                with self.cond:
+                    self.pending[:0] = lines[start:]
+                raise
+            
+            self.next_seq = seq + 1
+    
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=10)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sensor = self.sensor_id.encode("ascii")
+        epoch = self.epoch.encode("ascii")
+        sock.sendall(SHIP_MAGIC + SHIP_HELLO.pack(len(sensor), len(epoch)) + sensor + epoch)
+        self.sock = sock
+    
+    def _disconnect(self):
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+    
+    def _ship_spool(self):
+        spooled = sorted(self.spool_dir.glob("*.batch"))
+        
+        for start in range(0, len(spooled), self.max_in_flight):
+            window = spooled[start:start + self.max_in_flight]
+            if self.sock is None:
+                self._connect()
+            
+            frames = []
+            for path in window:
+                payload = path.read_bytes()
+                frames.append(SHIP_BATCH.pack(int(path.stem), len(payload)) + payload)
+            self.sock.sendall(b"".join(frames))
+            
+            for path in window:
+                (acked,) = SHIP_ACK.unpack(recv_exact(self.sock, SHIP_ACK.size))
+                if acked != int(path.stem):
+                    raise ConnectionError(f"unexpected ack {acked} for batch {path.stem}")
+                path.unlink()
+    
+    def _run(self):
+        backoff = 1.0
+        
+        while True:
+            with self.cond:
+                if self.running and len(self.pending) < self.batch_size:
+                    self.cond.wait(self.flush_interval)
+                stopping = not self.running
+            
+            try:
+                self._seal_pending()
+            except OSError as e:
+                print(f"Shipper cannot write to spool {self.spool_dir}: {e}")
+            
+            with self.cond:
+                if self.dropped:
+                    print(f"Shipper spool backlog full, dropped {self.dropped} events")
+                    self.dropped = 0
+                if stopping and self.pending:
+                    print(f"Shipper stopped with {len(self.pending)} unspooled events")
+            
+            try:
+                self._ship_spool()
+                backoff = 1.0
+            except (OSError, ConnectionError) as e:
+                self._disconnect()
+                if stopping:
+                    print(f"Shipper stopped with unsent batches left in {self.spool_dir}: {e}")
+                    return
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            
+            if stopping:
+                return
 
 
 class HoneyPot:
     
-    def __init__(self, log_dir="logs"):
+    def __init__(self, log_dir="logs", ship_to=None, sensor_id=None, sample_interval=0.005,
+                 config_path=None, drain_timeout=10.0):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
         self.running = True
         self.services = []
+        self.retired = []
+        self.sampler = StackSampler(interval=sample_interval)
+        self.config_path = config_path
+        self.drain_timeout = drain_timeout
+        self.stopped = threading.Event()
+        self.control = queue.SimpleQueue()
+        self.control_thread = None
         
         self.main_log = self.log_dir / "honeypot_main.log"
         self.json_log = self.log_dir / "honeypot_events.json"
         
+        self.shipper = None
+        if ship_to:
+            host, port = ship_to
+            self.shipper = EventShipper(
+                host, port,
+                spool_dir=self.log_dir / "spool",
+                sensor_id=sensor_id or socket.gethostname()
+            )
+            self.shipper.start()
+        
         self._log_event("HoneyPot starting...", level="INFO")
     
     def _log_event(self, message, level="INFO", data=None):
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        started = STAGES.start()
+        ts = time.time_ns()
+        timestamp = datetime.datetime.fromtimestamp(ts // 1_000_000_000).strftime("%Y-%m-%d %H:%M:%S")
         log_message = f"[{timestamp}] [{level}] {message}\n"
+        STAGES.stop("log", "format", started)
         
+        started = STAGES.start()
         print(log_message.strip())
+        STAGES.stop("log", "print", started)
         
+        started = STAGES.start()
         with open(self.main_log, "a", encoding="utf-8") as f:
             f.write(log_message)
+        STAGES.stop("log", "write", started)
         
         if data:
+            started = STAGES.start()
             json_entry = {
+                "schema": EVENT_SCHEMA_VERSION,
+                "ts": ts,
                 "timestamp": timestamp,
                 "level": level,
                 "message": message,
                 "data": data
             }
+            if self.shipper:
+                self.shipper.submit(json_entry)
+                STAGES.stop("log", "ship", started)
+                return
+            json_line = json.dumps(json_entry, ensure_ascii=False) + "\n"
+            STAGES.stop("log", "json", started)
+            
+            started = STAGES.start()
             with open(self.json_log, "a", encoding="utf-8") as f:
-                f.write(json.dumps(json_entry, ensure_ascii=False) + "\n")
+                f.write(json_line)
+            STAGES.stop("log", "json_write", started)
+    
+    def toggle_stage_timing(self, *_):
+        if STAGES.toggle():
+            self._log_event("Stage timing enabled", level="INFO")
+        else:
+            self._log_event("Stage timing disabled, report:\n" + STAGES.report(), level="INFO")
+    
+    def toggle_sampler(self, *_):
+        if not self.sampler.running:
+            self.sampler.start()
+            self._log_event("Stack sampler started", level="INFO")
+            return
+        
+        output_path = self.log_dir / f"profile-{datetime.datetime.now():%Y%m%d-%H%M%S}.folded"
+        samples = self.sampler.stop(output_path)
+        self._log_event(f"Stack sampler stopped, {samples} samples written to {output_path}", level="INFO")
+    
+    def _install_signal_handlers(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        
+        # SIGTERM drains like CTRL+C, SIGHUP reloads the config file,
+        # SIGUSR1 toggles per-stage timing, SIGUSR2 toggles the stack sampler.
+        # Handlers run on the main thread between any two bytecodes, possibly while it
+        # holds a lock they would need, so they only queue the work for the control thread.
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda *_: self.control.put(self.reload_config))
+            signal.signal(signal.SIGUSR1, lambda *_: self.control.put(self.toggle_stage_timing))
+            signal.signal(signal.SIGUSR2, lambda *_: self.control.put(self.toggle_sampler))
+    
+    def _run_control(self):
+        while True:
+            action = self.control.get()
+            if action is None or not self.running:
+                return
+            try:
+                action()
+            except Exception as e:
+                self._log_event(f"Control action {action.__name__} failed: {e}", level="ERROR")
     
     def add_service(self, service):
         self.services.append(service)
         service.honeypot = self
     
+    def _start_service(self, service):
+        try:
+            service.listen()
+        except OSError as e:
+            self._log_event(f"{service.name} failed to listen on port {service.port}: {e}", level="ERROR")
+            return False
+        
+        threading.Thread(target=service.start, daemon=True).start()
+        self._log_event(f"{service.name} started on port {service.port}", level="INFO")
+        return True
+    
+    def _retire_service(self, service):
+        service.stop()
+        self.services.remove(service)
+        self.retired.append(service)
+        self._log_event(f"{service.name} stopped on port {service.port}", level="INFO")
+    
+    def apply_config(self, config):
+        self.drain_timeout = config.get("drain_timeout", self.drain_timeout)
+        if Path(config.get("log_dir", self.log_dir)) != self.log_dir:
+            self._log_event("log_dir changes only take effect after a restart", level="WARNING")
+        
+        wanted = {(spec["type"], spec["port"]): spec for spec in config["services"]}
+        current = {(service.kind, service.port): service for service in self.services}
+        
+        removed = [service for key, service in current.items() if key not in wanted]
+        added = [key for key in wanted if key not in current]
+        
+        # a port that changes service type has to be released before it can be re-bound;
+        # every other listener is opened before the old one closes, so there is no accept gap
+        reused_ports = {port for _, port in added}
+        for service in [service for service in removed if service.port in reused_ports]:
+            self._retire_service(service)
+            removed.remove(service)
+        
+        for key, spec in wanted.items():
+            options = {name: spec[name] for name in ("banner", "max_connections", "timeout") if name in spec}
+            if key in current:
+                current[key].configure(**options)
+                continue
+            
+            service = SERVICE_TYPES[spec["type"]](port=spec["port"], **options)
+            self.add_service(service)
+            if not self._start_service(service):
+                self.services.remove(service)
+        
+        for service in removed:
+            self._retire_service(service)
+        
+        self.retired = [service for service in self.retired if service.clients]
+    
+    def reload_config(self, *_):
+        if not self.config_path:
+            self._log_event("No config file to reload", level="WARNING")
+            return
+        
+        try:
+            config = load_config(self.config_path)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            self._log_event(f"Config reload failed, keeping current config: {e}", level="ERROR")
+            return
+        
+        self._log_event(f"Reloading config from {self.config_path}", level="INFO")
+        try:
+            self.apply_config(config)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            self._log_event(f"Config reload failed part way: {e}", level="ERROR")
+    
     def start(self):
-        threads = []
+        self.control_thread = threading.Thread(target=self._run_control, daemon=True)
+        self.control_thread.start()
+        self._install_signal_handlers()
+        
         for service in self.services:
-            thread = threading.Thread(target=service.start, daemon=True)
-            thread.start()
-            threads.append(thread)
-            self._log_event(f"{service.name} started on port {service.port}", level="INFO")
+            if service.server is None:
+                self._start_service(service)
         
         self._log_event("All services active! Press CTRL+C to stop.", level="SUCCESS")
         
         try:
-            while self.running:
-                threading.Event().wait(1)
+            # a timeout-less wait can't be interrupted by CTRL+C on Windows
+            while not self.stopped.wait(1):
+                pass
         except KeyboardInterrupt:
-            self._log_event("Shutting down...", level="WARNING")
-            self.running = False
+            pass
+        
+        self.shutdown()
+    
+    def stop(self):
+        self.stopped.set()
     
-    def log_attack(self, service_name, attacker_ip, port, data):
+    def shutdown(self):
+        self._log_event("Shutting down...", level="WARNING")
+        self.running = False
+        if self.control_thread:
+            # let a queued reload or toggle finish before shutdown does its own
+            self.control.put(None)
+            self.control_thread.join()
+        deadline = time.monotonic() + self.drain_timeout
+        services = self.services + self.retired
+        
+        for service in services:
+            service.stop()
+        
+        pending = sum(service.drain(deadline) for service in services)
+        if pending:
+            self._log_event(f"Drain deadline reached, closing {pending} open sessions", level="WARNING")
+            for service in services:
+                service.abort_sessions()
+            # closed sessions still log what they captured on the way out
+            for service in services:
+                service.drain(time.monotonic() + 1.0)
+        
+        if STAGES.enabled:
+            self.toggle_stage_timing()
+        if self.sampler.running:
+            self.toggle_sampler()
+        if self.shipper:
+            self.shipper.stop(timeout=max(deadline - time.monotonic(), 1.0))
+        
+        self._log_event("Shutdown complete", level="INFO")
+    
+    def log_attack(self, service_name, attacker_ip, port, data, session=None):
         attack_data = {
             "service": service_name,
             "attacker_ip": attacker_ip,
             "port": port,
             "data": data
         }
+        if session:
+            attack_data.update(session.metrics())
         
         self._log_event(
             f"ATTACK DETECTED! Service: {service_name}, IP: {attacker_ip}, Port: {port}",
             level="ALERT",
             data=attack_data
         )
+    
+    def log_session(self, service_name, attacker_ip, port, session):
+        # connections that never sent anything still get their session metrics recorded
+        session_data = {
+            "service": service_name,
+            "attacker_ip": attacker_ip,
+            "port": port,
+            "data": ""
+        }
+        session_data.update(session.metrics())
+        
+        self._log_event(
+            f"Session closed without data. Service: {service_name}, IP: {attacker_ip}, "
+            f"Port: {port}, Reason: {session.close_reason}",
+            level="SESSION",
+            data=session_data
+        )
 
 
-class SSHHoneyPot:
+class HoneyPotService:
     
-    def __init__(self, port=2222):
-        self.name = "SSH HoneyPot"
-        self.port = port
+    kind = None
+    protocol = None
+    default_port = None
+    default_banner = None
+    
+    def __init__(self, port=None, banner=None, max_connections=100, timeout=60):
+        self.name = f"{self.protocol} HoneyPot"
+        self.port = self.default_port if port is None else port
+        self.banner = banner or self.default_banner
+        self.max_connections = max_connections
+        self.timeout = timeout
         self.honeypot = None
         self.log_file = None
-        
-    def start(self):
+        self.server = None
+        self.running = False
+        self.aborting = False
+        self.clients = set()
+        self.clients_changed = threading.Condition()
+    
+    def configure(self, banner=None, max_connections=None, timeout=None):
+        self.banner = banner or self.default_banner
+        if max_connections is not None:
+            self.max_connections = max_connections
+        if timeout is not None:
+            self.timeout = timeout
+    
+    def listen(self):
         if self.honeypot:
-            self.log_file = self.honeypot.log_dir / f"ssh_port_{self.port}.log"
+            self.log_file = self.honeypot.log_dir / f"{self.kind}_port_{self.port}.log"
         
         server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         
         try:
             server.bind(('0.0.0.0', self.port))
-            server.listen(5)
-            
-            while self.honeypot.running:
+            server.listen(128)
+        except OSError:
+            server.close()
+            raise
+        
+        self.server = server
+        self.running = True
+    
+    def start(self):
+        if self.server is None:
+            try:
+                self.listen()
+            except OSError as e:
+                if self.honeypot:
+                    self.honeypot._log_event(f"{self.protocol} error: {e}", level="ERROR")
+                return
+        
+        try:
+            while self.running:
                 try:
-                    client, address = server.accept()
+                    client, address = self.server.accept()
+                except OSError:
+                    break
+                
+                started = STAGES.start()
+                # a bad connection must never take the listener down with it
+                try:
+                    with self.clients_changed:
+                        if len(self.clients) >= self.max_connections:
+                            client.close()
+                            continue
+                        self.clients.add(client)
+                    
+                    if self.timeout:
+                        client.settimeout(self.timeout)
                     threading.Thread(
-                        target=self._handle_client,
+                        target=self._serve_client,
                         args=(client, address),
                         daemon=True
                     ).start()
-                except:
-                    break
-        except Exception as e:
-            if self.honeypot:
-                self.honeypot._log_event(f"SSH error: {e}", level="ERROR")
+                except (OSError, ValueError, TypeError, RuntimeError) as e:
+                    with self.clients_changed:
+                        self.clients.discard(client)
+                        self.clients_changed.notify_all()
+                    client.close()
+                    if self.honeypot:
+                        self.honeypot._log_event(f"{self.protocol} connection setup failed for {address[0]}: {e}", level="ERROR")
+                    continue
+                STAGES.stop(self.protocol, "accept", started)
         finally:
-            server.close()
+            self.server.close()
+    
+    def _serve_client(self, client, address):
+        try:
+            self._handle_client(client, address)
+        finally:
+            with self.clients_changed:
+                self.clients.discard(client)
+                self.clients_changed.notify_all()
+    
+    def stop(self):
+        self.running = False
+        if self.server:
+            # shutdown() wakes the thread blocked in accept(), close() alone does not
+            try:
+                self.server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.server.close()
+    
+    def drain(self, deadline):
+        with self.clients_changed:
+            while self.clients:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.clients_changed.wait(remaining)
+            return len(self.clients)
+    
+    def abort_sessions(self):
+        self.aborting = True
+        with self.clients_changed:
+            clients = list(self.clients)
+        
+        # only shut the read side, so handlers can still answer and log the session
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+
+
+class SSHHoneyPot(HoneyPotService):
+    
+    kind = "ssh"
+    protocol = "SSH"
+    default_port = 2222
+    default_banner = "SSH-2.0-OpenSSH_8.2p1 Ubuntu-4ubuntu0.5"
     
     def _handle_client(self, client, address):
-        ip = address[0]
+        session = Session(client, address, self)
+        ip = session.ip
+        attack = None
         
         try:
-            banner = b"SSH-2.0-OpenSSH_8.2p1 Ubuntu-4ubuntu0.5\r\n"
-            client.send(banner)
+            session.send(f"{self.banner}\r\n".encode())
             
-            data = client.recv(4096)
+            data = session.recv(4096)
             
             if data:
                 decoded_data = data.decode('utf-8', errors='ignore')
                 
+                started = STAGES.start()
                 log_entry = f"""
 {'='*80}
 Timestamp: {datetime.datetime.now()}
+Session: {session.session_id}
 IP Address: {ip}
 Port: {self.port}
 Protocol: SSH
@@ -133,68 +820,55 @@ Data (Raw): {data.hex()}
 Data (Decoded): {decoded_data}
 {'='*80}
 """
+                STAGES.stop(self.protocol, "format", started)
+                started = STAGES.start()
                 with open(self.log_file, "a", encoding="utf-8") as f:
                     f.write(log_entry)
+                STAGES.stop(self.protocol, "write", started)
+                
+                attack = decoded_data[:200]
                 
+                session.send(b"\x00\x00\x00\x0c\x05\x14\x00\x00\x00\x00\x00\x00\x00\x00")
+            
+        except Exception as e:
+            session.close_reason = session.close_reason or close_reason_for(e)
+        finally:
+            session.close()
+            if attack is not None:
                 self.honeypot.log_attack(
                     service_name="SSH",
                     attacker_ip=ip,
                     port=self.port,
-                    data=decoded_data[:200]
+                    data=attack,
+                    session=session
+                )
+            else:
+                self.honeypot.log_session(
+                    service_name="SSH",
+                    attacker_ip=ip,
+                    port=self.port,
+                    session=session
                 )
-                
-                client.send(b"\x00\x00\x00\x0c\x05\x14\x00\x00\x00\x00\x00\x00\x00\x00")
-            
-        except:
-            pass
-        finally:
-            client.close()
 
 
-class FTPHoneyPot:
+class FTPHoneyPot(HoneyPotService):
     
-    def __init__(self, port=2121):
-        self.name = "FTP HoneyPot"
-        self.port = port
-        self.honeypot = None
-        self.log_file = None
-        
-    def start(self):
-        if self.honeypot:
-            self.log_file = self.honeypot.log_dir / f"ftp_port_{self.port}.log"
-        
-        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
-        try:
-            server.bind(('0.0.0.0', self.port))
-            server.listen(5)
-            
-            while self.honeypot.running:
-                try:
-                    client, address = server.accept()
-                    threading.Thread(
-                        target=self._handle_client,
-                        args=(client, address),
-                        daemon=True
-                    ).start()
-                except:
-                    break
-        except Exception as e:
-            if self.honeypot:
-                self.honeypot._log_event(f"FTP error: {e}", level="ERROR")
-        finally:
-            server.close()
+    kind = "ftp"
+    protocol = "FTP"
+    default_port = 2121
+    default_banner = "Welcome to FTP Server"
     
     def _handle_client(self, client, address):
-        ip = address[0]
+        session = Session(client, address, self)
+        ip = session.ip
         commands = []
+        attack = None
         
         try:
-            client.send(b"220 Welcome to FTP Server\r\n")
+            session.send(f"220 {self.banner}\r\n".encode())
             
             while True:
-                data = client.recv(1024)
+                data = session.recv(1024)
                 if not data:
                     break
                 
@@ -202,18 +876,23 @@ class FTPHoneyPot:
                 commands.append(command)
                 
                 if command.upper().startswith('USER'):
-                    client.send(b"331 Password required\r\n")
+                    session.send(b"331 Password required\r\n")
                 elif command.upper().startswith('PASS'):
-                    client.send(b"530 Login incorrect\r\n")
+                    session.send(b"530 Login incorrect\r\n")
                 elif command.upper().startswith('QUIT'):
-                    client.send(b"221 Goodbye\r\n")
+                    session.send(b"221 Goodbye\r\n")
+                    session.close_reason = "quit"
                     break
                 else:
-                    client.send(b"502 Command not implemented\r\n")
+                    session.send(b"502 Command not implemented\r\n")
             
-            log_entry = f"""
+            # a client that only read the banner is a SESSION, not an attack
+            if commands:
+                started = STAGES.start()
+                log_entry = f"""
 {'='*80}
 Timestamp: {datetime.datetime.now()}
+Session: {session.session_id}
 IP Address: {ip}
 Port: {self.port}
 Protocol: FTP
@@ -221,68 +900,55 @@ Commands Executed:
 {chr(10).join(f'  - {cmd}' for cmd in commands)}
 {'='*80}
 """
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(log_entry)
-            
-            self.honeypot.log_attack(
-                service_name="FTP",
-                attacker_ip=ip,
-                port=self.port,
-                data=", ".join(commands)
-            )
+                STAGES.stop(self.protocol, "format", started)
+                started = STAGES.start()
+                with open(self.log_file, "a", encoding="utf-8") as f:
+                    f.write(log_entry)
+                STAGES.stop(self.protocol, "write", started)
+                
+                attack = ", ".join(commands)
             
-        except:
-            pass
+        except Exception as e:
+            session.close_reason = session.close_reason or close_reason_for(e)
         finally:
-            client.close()
+            session.close()
+            if attack is not None:
+                self.honeypot.log_attack(
+                    service_name="FTP",
+                    attacker_ip=ip,
+                    port=self.port,
+                    data=attack,
+                    session=session
+                )
+            else:
+                self.honeypot.log_session(
+                    service_name="FTP",
+                    attacker_ip=ip,
+                    port=self.port,
+                    session=session
+                )
 
 
-class HTTPHoneyPot:
+class HTTPHoneyPot(HoneyPotService):
     
-    def __init__(self, port=8080):
-        self.name = "HTTP HoneyPot"
-        self.port = port
-        self.honeypot = None
-        self.log_file = None
-        
-    def start(self):
-        if self.honeypot:
-            self.log_file = self.honeypot.log_dir / f"http_port_{self.port}.log"
-        
-        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
-        try:
-            server.bind(('0.0.0.0', self.port))
-            server.listen(5)
-            
-            while self.honeypot.running:
-                try:
-                    client, address = server.accept()
-                    threading.Thread(
-                        target=self._handle_client,
-                        args=(client, address),
-                        daemon=True
-                    ).start()
-                except:
-                    break
-        except Exception as e:
-            if self.honeypot:
-                self.honeypot._log_event(f"HTTP error: {e}", level="ERROR")
-        finally:
-            server.close()
+    kind = "http"
+    protocol = "HTTP"
+    default_port = 8080
+    default_banner = "Apache/2.4.41 (Ubuntu)"
     
     def _handle_client(self, client, address):
-        ip = address[0]
+        session = Session(client, address, self)
+        ip = session.ip
+        attack = None
         
         try:
-            data = client.recv(4096)
+            data = session.recv(4096)
             
             if data:
                 request = data.decode('utf-8', errors='ignore')
                 
-                response = """HTTP/1.1 200 OK
-Server: Apache/2.4.41 (Ubuntu)
+                response = f"""HTTP/1.1 200 OK
+Server: {self.banner}
 Content-Type: text/html
 Content-Length: 196
 
@@ -293,11 +959,13 @@ Content-Length: 196
 <p>It works! This is the default web page for this server.</p>
 </body>
 </html>"""
-                client.send(response.encode())
+                session.send(response.encode())
                 
+                started = STAGES.start()
                 log_entry = f"""
 {'='*80}
 Timestamp: {datetime.datetime.now()}
+Session: {session.session_id}
 IP Address: {ip}
 Port: {self.port}
 Protocol: HTTP
@@ -305,76 +973,67 @@ Request:
 {request}
 {'='*80}
 """
+                STAGES.stop(self.protocol, "format", started)
+                started = STAGES.start()
                 with open(self.log_file, "a", encoding="utf-8") as f:
                     f.write(log_entry)
+                STAGES.stop(self.protocol, "write", started)
+                
+                attack = request.split('\n')[0] if request else "No data"
                 
+        except Exception as e:
+            session.close_reason = session.close_reason or close_reason_for(e)
+        finally:
+            session.close()
+            if attack is not None:
                 self.honeypot.log_attack(
                     service_name="HTTP",
                     attacker_ip=ip,
                     port=self.port,
-                    data=request.split('\n')[0] if request else "No data"
+                    data=attack,
+                    session=session
+                )
+            else:
+                self.honeypot.log_session(
+                    service_name="HTTP",
+                    attacker_ip=ip,
+                    port=self.port,
+                    session=session
                 )
-                
-        except:
-            pass
-        finally:
-            client.close()
 
 
-class TelnetHoneyPot:
+class TelnetHoneyPot(HoneyPotService):
     
-    def __init__(self, port=2323):
-        self.name = "Telnet HoneyPot"
-        self.port = port
-        self.honeypot = None
-        self.log_file = None
-        
-    def start(self):
-        if self.honeypot:
-            self.log_file = self.honeypot.log_dir / f"telnet_port_{self.port}.log"
-        
-        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        
-        try:
-            server.bind(('0.0.0.0', self.port))
-            server.listen(5)
-            
-            while self.honeypot.running:
-                try:
-                    client, address = server.accept()
-                    threading.Thread(
-                        target=self._handle_client,
-                        args=(client, address),
-                        daemon=True
-                    ).start()
-                except:
-                    break
-        except Exception as e:
-            if self.honeypot:
-                self.honeypot._log_event(f"Telnet error: {e}", level="ERROR")
-        finally:
-            server.close()
+    kind = "telnet"
+    protocol = "Telnet"
+    default_port = 2323
+    default_banner = "Ubuntu 20.04.3 LTS"
     
     def _handle_client(self, client, address):
-        ip = address[0]
+        session = Session(client, address, self)
+        ip = session.ip
         credentials = []
+        attack = None
         
         try:
-            client.send(b"\r\nUbuntu 20.04.3 LTS\r\n\r\nlogin: ")
+            session.send(f"\r\n{self.banner}\r\n\r\nlogin: ".encode())
             
-            username = client.recv(1024).decode('utf-8', errors='ignore').strip()
+            username = session.recv(1024).decode('utf-8', errors='ignore').strip()
             credentials.append(f"Username: {username}")
             
-            client.send(b"Password: ")
-            password = client.recv(1024).decode('utf-8', errors='ignore').strip()
+            session.send(b"Password: ")
+            password = session.recv(1024).decode('utf-8', errors='ignore').strip()
             credentials.append(f"Password: {password}")
             
-            client.send(b"\r\nLogin incorrect\r\n")
+            session.send(b"\r\nLogin incorrect\r\n")
             
-            log_entry = f"""
+            # a client that only read the banner is a SESSION, not an attack
+            if session.bytes_in:
+                started = STAGES.start()
+                log_entry = f"""
 {'='*80}
 Timestamp: {datetime.datetime.now()}
+Session: {session.session_id}
 IP Address: {ip}
 Port: {self.port}
 Protocol: Telnet
@@ -382,20 +1041,84 @@ Credentials Attempted:
 {chr(10).join(f'  - {cred}' for cred in credentials)}
 {'='*80}
 """
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(log_entry)
-            
-            self.honeypot.log_attack(
-                service_name="Telnet",
-                attacker_ip=ip,
-                port=self.port,
-                data=", ".join(credentials)
-            )
+                STAGES.stop(self.protocol, "format", started)
+                started = STAGES.start()
+                with open(self.log_file, "a", encoding="utf-8") as f:
+                    f.write(log_entry)
+                STAGES.stop(self.protocol, "write", started)
+                
+                attack = ", ".join(credentials)
             
-        except:
-            pass
+        except Exception as e:
+            session.close_reason = session.close_reason or close_reason_for(e)
         finally:
-            client.close()
+            session.close()
+            if attack is not None:
+                self.honeypot.log_attack(
+                    service_name="Telnet",
+                    attacker_ip=ip,
+                    port=self.port,
+                    data=attack,
+                    session=session
+                )
+            else:
+                self.honeypot.log_session(
+                    service_name="Telnet",
+                    attacker_ip=ip,
+                    port=self.port,
+                    session=session
+                )
+
+
+SERVICE_TYPES = {
+    service.kind: service
+    for service in (SSHHoneyPot, FTPHoneyPot, HTTPHoneyPot, TelnetHoneyPot)
+}
+
+
+def load_config(path):
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    
+    if not isinstance(config, dict):
+        raise ValueError("config must be a JSON object")
+    if not isinstance(config.get("log_dir", ""), str):
+        raise ValueError(f"invalid log_dir: {config['log_dir']!r}")
+    services = config.get("services")
+    if not isinstance(services, list) or not services:
+        raise ValueError("config needs a non-empty 'services' list")
+    if not is_number(config.get("drain_timeout", 0)) or config.get("drain_timeout", 0) < 0:
+        raise ValueError(f"invalid drain_timeout: {config['drain_timeout']!r}")
+    
+    ports = set()
+    for spec in services:
+        if not isinstance(spec, dict):
+            raise ValueError(f"service entries must be objects, got {spec!r}")
+        if not isinstance(spec.get("type"), str) or spec["type"] not in SERVICE_TYPES:
+            raise ValueError(f"unknown service type: {spec.get('type')!r}")
+        spec.setdefault("port", SERVICE_TYPES[spec["type"]].default_port)
+        if not isinstance(spec["port"], int) or not 0 < spec["port"] < 65536:
+            raise ValueError(f"invalid port for {spec['type']}: {spec['port']!r}")
+        if spec["port"] in ports:
+            raise ValueError(f"port {spec['port']} is used more than once")
+        ports.add(spec["port"])
+        
+        if "banner" in spec and (not isinstance(spec["banner"], str) or not spec["banner"]):
+            raise ValueError(f"invalid banner for {spec['type']}: {spec['banner']!r}")
+        if "max_connections" in spec and (
+            not isinstance(spec["max_connections"], int) or isinstance(spec["max_connections"], bool)
+            or spec["max_connections"] < 1
+        ):
+            raise ValueError(f"invalid max_connections for {spec['type']}: {spec['max_connections']!r}")
+        if "timeout" in spec and (not is_number(spec["timeout"]) or spec["timeout"] <= 0):
+            raise ValueError(f"invalid timeout for {spec['type']}: {spec['timeout']!r}")
+    
+    return config
+
+
+def is_number(value):
+    # json.load accepts NaN and Infinity, which no socket timeout will
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
 
 
 def print_banner():
@@ -423,23 +1146,53 @@ Do not use on production systems without authorization.
 
 def main():
     parser = argparse.ArgumentParser(description='HoneyPot - Attack detection system')
+    parser.add_argument('--config', help='JSON config file with services, ports, banners and limits (reloaded on SIGHUP)')
     parser.add_argument('--log-dir', default='logs', help='Log directory')
     parser.add_argument('--ssh-port', type=int, default=2222, help='SSH port')
     parser.add_argument('--ftp-port', type=int, default=2121, help='FTP port')
     parser.add_argument('--http-port', type=int, default=8080, help='HTTP port')
     parser.add_argument('--telnet-port', type=int, default=2323, help='Telnet port')
+    parser.add_argument('--ship-to', help='Ship events to a collector at HOST:PORT')
+    parser.add_argument('--sensor-id', help='Sensor name used when shipping (default: hostname)')
+    parser.add_argument('--profile-stages', action='store_true', help='Start with per-stage timing enabled (toggle: SIGUSR1)')
+    parser.add_argument('--sample-interval', type=float, default=0.005, help='Stack sampler interval in seconds (toggle: SIGUSR2)')
     
     args = parser.parse_args()
     
-    print_banner()
+    ship_to = None
+    if args.ship_to:
+        host, _, port = args.ship_to.rpartition(':')
+        ship_to = (host or 'localhost', int(port))
     
-    honeypot = HoneyPot(log_dir=args.log_dir)
+    if args.config:
+        try:
+            config = load_config(args.config)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot load config {args.config}: {e}")
+    else:
+        config = {
+            "services": [
+                {"type": "ssh", "port": args.ssh_port},
+                {"type": "ftp", "port": args.ftp_port},
+                {"type": "http", "port": args.http_port},
+                {"type": "telnet", "port": args.telnet_port}
+            ]
+        }
+    
+    print_banner()
     
-    honeypot.add_service(SSHHoneyPot(port=args.ssh_port))
-    honeypot.add_service(FTPHoneyPot(port=args.ftp_port))
-    honeypot.add_service(HTTPHoneyPot(port=args.http_port))
-    honeypot.add_service(TelnetHoneyPot(port=args.telnet_port))
+    honeypot = HoneyPot(
+        log_dir=config.get("log_dir", args.log_dir),
+        ship_to=ship_to,
+        sensor_id=args.sensor_id,
+        sample_interval=args.sample_interval,
+        config_path=args.config,
+        drain_timeout=config.get("drain_timeout", 10.0)
+    )
+    if args.profile_stages:
+        honeypot.toggle_stage_timing()
     
+    honeypot.apply_config(config)
     honeypot.start()
 
 
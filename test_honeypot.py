@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 import socket
 import time
+import json
+import datetime
+import tempfile
+import threading
+from pathlib import Path
 
 
 def test_ssh(port=2222):
@@ -129,6 +134,586 @@ def test_telnet(port=2323):
         return False
 
 
+def make_event(timestamp, service="SSH", ip="192.168.1.100", port=2222, data="root", schema=2):
+    event = {
+        "timestamp": timestamp,
+        "level": "ALERT",
+        "message": f"ATTACK DETECTED! Service: {service}, IP: {ip}, Port: {port}",
+        "data": {"service": service, "attacker_ip": ip, "port": port, "data": data}
+    }
+    if schema == 2:
+        local = datetime.datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+        event["schema"] = 2
+        event["ts"] = int(local.timestamp()) * 1_000_000_000 + 500
+        event["data"].update(session_id="0" * 32, bytes_in=10, bytes_out=20, duration_ns=1000, close_reason="completed")
+    return event
+
+
+def write_events(path, events):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+
+def check(name, run, *args):
+    # the manual runner reports a failure and moves on; pytest calls the run_* functions
+    # directly so a failure comes with its traceback
+    try:
+        run(*args)
+    except Exception as e:
+        print(f"✗ {name} test failed: {e}")
+        return False
+    
+    print(f"✓ {name} test passed!")
+    return True
+
+
+def run_export():
+    print(f"\n{'='*60}")
+    print("Testing streaming columnar export...")
+    print(f"{'='*60}")
+    
+    from analyze_logs import LogAnalyzer
+    import gzip
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        write_events(log_dir / "honeypot_events.json", [
+            make_event("2025-01-31 10:00:00", data="x" * 500),
+            make_event("2025-01-31 11:00:00", service="FTP", ip="10.0.0.1"),
+            make_event("2025-02-01 09:00:00")
+        ])
+        # a spooled event that reached the collector after midnight
+        write_events(log_dir / "collected" / "2025-02-01" / "dmz.json", [
+            make_event("2025-01-31 23:59:30", ip="10.0.0.2")
+        ])
+        
+        analyzer = LogAnalyzer(log_dir=log_dir, load=False)
+        rows = analyzer.export_columnar(fmt="ndjson", row_group_size=2, end="2025-01-31 23:59:59")
+        exported = []
+        for chunk in sorted((log_dir / "honeypot_report").glob("part-*.ndjson.gz")):
+            with gzip.open(chunk, "rt", encoding="utf-8") as f:
+                exported.extend(json.loads(line) for line in f)
+        
+        print(f"  Rows exported: {rows}, chunks: {len(list((log_dir / 'honeypot_report').glob('*.gz')))}")
+        assert rows == 3 and len(exported) == 3, f"expected 3 rows up to the end bound, got {rows}"
+        assert len(exported[0]["data"]) == 500, "payload was truncated"
+        assert "10.0.0.2" in {row["attacker_ip"] for row in exported}, "late collector partition was skipped"
+        
+        filtered = analyzer.export_columnar(fmt="ndjson", service="FTP", ip="10.0.0.1")
+        print(f"  Rows for FTP/10.0.0.1: {filtered}")
+        assert filtered == 1, f"expected 1 FTP row, got {filtered}"
+        
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("  pyarrow not installed, skipping parquet")
+        else:
+            analyzer.export_columnar(fmt="parquet", row_group_size=2)
+            parquet = pq.ParquetFile(log_dir / "honeypot_report.parquet")
+            print(f"  Parquet rows: {parquet.metadata.num_rows}, row groups: {parquet.metadata.num_row_groups}")
+            assert parquet.metadata.num_rows == 4 and parquet.metadata.num_row_groups == 2
+
+
+def test_export():
+    run_export()
+
+
+def run_sessions():
+    print(f"\n{'='*60}")
+    print("Testing v2 session events and v1 log compatibility...")
+    print(f"{'='*60}")
+    
+    from honeypot import HoneyPot, SSHHoneyPot, FTPHoneyPot, HTTPHoneyPot, TelnetHoneyPot
+    from analyze_logs import LogAnalyzer, event_hour
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        honeypot = HoneyPot(log_dir=tmp, drain_timeout=2)
+        ssh = SSHHoneyPot(port=0, timeout=0.3)
+        http = HTTPHoneyPot(port=0)
+        ftp = FTPHoneyPot(port=0)
+        telnet = TelnetHoneyPot(port=0)
+        for service in (ssh, http, ftp, telnet):
+            honeypot.add_service(service)
+            service.listen()
+            service.port = service.server.getsockname()[1]
+            threading.Thread(target=service.start, daemon=True).start()
+        
+        idle = socket.create_connection(('127.0.0.1', ssh.port), timeout=5)
+        idle.recv(1024)
+        time.sleep(0.6)
+        idle.close()
+        
+        socket.create_connection(('127.0.0.1', http.port), timeout=5).close()
+        
+        sock = socket.create_connection(('127.0.0.1', http.port), timeout=5)
+        sock.send(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        sock.recv(4096)
+        sock.close()
+        
+        # port scans that read the banner and hang up are sessions, not attacks
+        for port in (ftp.port, telnet.port):
+            sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+            sock.recv(1024)
+            sock.shutdown(socket.SHUT_WR)
+            while sock.recv(1024):
+                pass
+            sock.close()
+        
+        sock = socket.create_connection(('127.0.0.1', ftp.port), timeout=5)
+        sock.recv(1024)
+        sock.send(b"USER root\r\n")
+        sock.recv(1024)
+        sock.send(b"QUIT\r\n")
+        sock.recv(1024)
+        sock.close()
+        
+        honeypot.shutdown()
+        
+        with open(Path(tmp) / "honeypot_events.json", encoding="utf-8") as f:
+            events = [json.loads(line) for line in f]
+        reasons = sorted((e["level"], e["data"]["service"], e["data"]["close_reason"]) for e in events)
+        print(f"  Events: {reasons}")
+        assert reasons == [
+            ("ALERT", "FTP", "quit"),
+            ("ALERT", "HTTP", "completed"),
+            ("SESSION", "FTP", "client_closed"),
+            ("SESSION", "HTTP", "client_closed"),
+            ("SESSION", "SSH", "timeout"),
+            ("SESSION", "Telnet", "client_closed")
+        ]
+        assert all(e["schema"] == 2 and isinstance(e["ts"], int) for e in events)
+        assert len({e["data"]["session_id"] for e in events}) == len(events), "session ids are not unique"
+        assert all(e["data"]["bytes_out"] > 0 for e in events if e["data"]["service"] == "SSH")
+        
+        # old v1 lines must still be readable next to v2 ones
+        write_events(Path(tmp) / "honeypot_events.json", [make_event("2025-01-31 14:30:05", schema=1)])
+        analyzer = LogAnalyzer(log_dir=tmp)
+        stats = analyzer.get_statistics()
+        hours = sorted(event_hour(attack) for attack in analyzer.attacks)
+        print(f"  Attacks read: {stats['total_attacks']}, hours: {hours}")
+        assert stats['total_attacks'] == 3 and 14 in hours
+        assert event_hour(make_event("2025-01-31 14:30:05")) == 14
+
+
+def test_sessions():
+    run_sessions()
+
+
+def run_shipping(events=200000):
+    print(f"\n{'='*60}")
+    print(f"Testing event shipping to a local collector ({events} events)...")
+    print(f"{'='*60}")
+    
+    from honeypot import EventShipper, SHIP_MAGIC, SHIP_HELLO
+    from collector import EventCollector
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        collector = EventCollector(store_dir=Path(tmp) / "store", host="127.0.0.1", port=0)
+        collector.bind()
+        threading.Thread(target=collector.start, daemon=True).start()
+        
+        shippers = [
+            EventShipper("127.0.0.1", collector.port, Path(tmp) / f"spool-{n}",
+                         sensor_id=f"sensor-{n}", batch_size=2000, flush_interval=0.1)
+            for n in range(4)
+        ]
+        entry = {
+            "timestamp": "2025-01-31 14:30:05",
+            "level": "ALERT",
+            "message": "ATTACK DETECTED!",
+            "data": {"service": "SSH", "attacker_ip": "192.168.1.100", "port": 2222, "data": "x" * 64}
+        }
+        
+        started = time.time()
+        for shipper in shippers:
+            shipper.start()
+        for i in range(events):
+            shippers[i % len(shippers)].submit(entry)
+        for shipper in shippers:
+            shipper.stop()
+        rate = events / (time.time() - started)
+        
+        # a second sensor reusing an id (or a wiped spool) restarts its seqs at 1
+        duplicate = EventShipper("127.0.0.1", collector.port, Path(tmp) / "spool-dup",
+                                 sensor_id="sensor-0", batch_size=2000, flush_interval=0.1)
+        duplicate.start()
+        for i in range(100):
+            duplicate.submit(entry)
+        duplicate.stop()
+        shippers.append(duplicate)
+        events += 100
+        
+        # a sensor still connected at shutdown is cut off before its store closes
+        idle = socket.create_connection(('127.0.0.1', collector.port), timeout=5)
+        idle.sendall(SHIP_MAGIC + SHIP_HELLO.pack(4, 32) + b"idle" + b"0" * 32)
+        time.sleep(0.2)
+        collector.stop()
+        assert not collector.connections, "sensor handlers outlived collector.stop()"
+        assert idle.recv(1) == b"", "collector left a sensor connection open"
+        idle.close()
+        
+        leftover = sum(len(list(s.spool_dir.glob("*.batch"))) for s in shippers)
+        stored = sum(
+            sum(1 for _ in open(path, encoding="utf-8"))
+            for path in (Path(tmp) / "store" / "collected").glob("*/*.json")
+        )
+        print(f"  Events stored: {stored}, spooled leftovers: {leftover}")
+        print(f"  Throughput: {rate:,.0f} events/s")
+        assert stored == events, f"collector stored {stored} of {events} events"
+        assert not leftover, f"{leftover} batches left in the spools"
+
+
+def test_shipping():
+    run_shipping()
+
+
+def run_collector_rate(sensors=4, batches=100, min_rate=200000):
+    print(f"\n{'='*60}")
+    print(f"Benchmarking collector ingest ({sensors} sensors x {batches} batches)...")
+    print(f"{'='*60}")
+    
+    import uuid
+    import zlib
+    from honeypot import SHIP_MAGIC, SHIP_HELLO, SHIP_BATCH, SHIP_ACK, recv_exact
+    from collector import EventCollector
+    
+    # sensors are separate processes in production, so pre-encode one batch and
+    # measure only what the collector does with it
+    line = json.dumps(make_event("2025-01-31 14:30:05", data="x" * 64)) + "\n"
+    payload = zlib.compress((line * 2000).encode("utf-8"), 1)
+    
+    def ship(sensor_id):
+        sock = socket.create_connection(('127.0.0.1', collector.port), timeout=10)
+        sensor, epoch = sensor_id.encode("ascii"), uuid.uuid4().hex.encode("ascii")
+        sock.sendall(SHIP_MAGIC + SHIP_HELLO.pack(len(sensor), len(epoch)) + sensor + epoch)
+        for start in range(0, batches, 64):
+            window = range(start + 1, min(start + 64, batches) + 1)
+            sock.sendall(b"".join(SHIP_BATCH.pack(seq, len(payload)) + payload for seq in window))
+            for seq in window:
+                assert SHIP_ACK.unpack(recv_exact(sock, SHIP_ACK.size)) == (seq,)
+        sock.close()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        collector = EventCollector(store_dir=tmp, host="127.0.0.1", port=0)
+        collector.bind()
+        threading.Thread(target=collector.start, daemon=True).start()
+        
+        started = time.perf_counter()
+        threads = [threading.Thread(target=ship, args=(f"bench-{n}",)) for n in range(sensors)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        rate = sensors * batches * 2000 / (time.perf_counter() - started)
+        collector.stop()
+    
+    print(f"  Collector ingest: {rate:,.0f} events/s")
+    assert rate >= min_rate, f"collector ingested {rate:,.0f} events/s, expected at least {min_rate:,}"
+
+
+def test_collector_rate():
+    run_collector_rate()
+
+
+def run_queries(concurrent=4):
+    print(f"\n{'='*60}")
+    print("Testing rollup queries against raw event scans...")
+    print(f"{'='*60}")
+    
+    import os
+    import analyze_logs
+    from analyze_logs import LogAnalyzer
+    
+    # a half-hour UTC offset makes local hour/day buckets straddle the 15-minute rollup slots
+    saved_tz = os.environ.get("TZ")
+    os.environ["TZ"] = "IST-5:30"
+    time.tzset()
+    analyze_logs._utc_offsets.clear()
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            log_dir = Path(tmp)
+            events_log = log_dir / "honeypot_events.json"
+            write_events(events_log, [
+                make_event("2025-01-31 10:05:00"),
+                make_event("2025-01-31 10:05:40"),
+                make_event("2025-01-31 10:50:00", service="FTP", ip="10.0.0.1", port=2121),
+                make_event("2025-01-31 23:59:30", ip="10.0.0.2")
+            ])
+            write_events(log_dir / "collected" / "2025-02-01" / "dmz.json", [
+                make_event("2025-02-01 00:10:00", ip="10.0.1.5")
+            ])
+            analyzer = LogAnalyzer(log_dir=log_dir, load=False)
+            
+            cases = [
+                {},
+                {"group_by": ("service",), "granularity": "hour"},
+                {"group_by": ("ip",), "ip": "10.0.0.0/16"},
+                {"granularity": "day", "service": "SSH"},
+                {"granularity": "minute", "start": "2025-01-31 10:05:00", "end": "2025-01-31 23:59:59"}
+            ]
+            for case in cases:
+                options = {"start": None, "end": None, "service": None, "port": None, "ip": None,
+                           "group_by": (), "granularity": None}
+                options.update(case)
+                rollup = analyzer.query(**options)
+                scan = analyzer._query_events(payload="", **options)
+                print(f"  {case or 'totals'}: {len(rollup)} rows, matches scan: {rollup == scan}")
+                assert rollup == scan, f"rollups disagree with the raw scan for {case}"
+            
+            # bounds inside a minute are rejected on both paths rather than answered differently
+            for bounds in ({"start": "2025-01-31 10:05:30"}, {"end": "2025-01-31 10:05:00"}):
+                for payload in (None, "r"):
+                    try:
+                        analyzer.query(payload=payload, **bounds)
+                    except ValueError:
+                        continue
+                    raise AssertionError(f"query accepted {bounds} with payload={payload!r}")
+            
+            hours = {row["bucket"]: row["attacks"] for row in analyzer.query(granularity="hour")}
+            days = {row["bucket"]: row["attacks"] for row in analyzer.query(granularity="day")}
+            cidr = {row["ip"] for row in analyzer.query(ip="10.0.0.0/24", group_by=("ip",))}
+            print(f"  Hours: {hours}")
+            print(f"  Days: {days}, CIDR IPs: {sorted(cidr)}")
+            assert hours == {"2025-01-31 10:00": 3, "2025-01-31 23:00": 1, "2025-02-01 00:00": 1}
+            assert days == {"2025-01-31": 4, "2025-02-01": 1}
+            assert cidr == {"10.0.0.1", "10.0.0.2"}
+            
+            # appended lines are folded in from the stored offset, not recounted
+            write_events(events_log, [make_event("2025-01-31 11:00:00")])
+            appended = analyzer.query()[0]["attacks"]
+            db = analyzer.open_rollups()
+            offsets = dict(db.execute("SELECT path, offset FROM rollup_offsets"))
+            db.close()
+            print(f"  After append: {appended} attacks")
+            assert appended == 6
+            assert offsets["honeypot_events.json"] == events_log.stat().st_size
+            
+            # a truncated log invalidates the stored counts and triggers a rebuild
+            events_log.write_text("")
+            write_events(events_log, [make_event("2025-01-31 12:00:00")])
+            rebuilt = analyzer.query()[0]["attacks"]
+            print(f"  After truncation: {rebuilt} attacks")
+            assert rebuilt == 2
+            
+            # a rotated log that grew past the old offset before the next query is still read from the start
+            write_events(events_log, [make_event("2025-01-31 12:30:00", data="x" * 500)])
+            assert analyzer.query()[0]["attacks"] == 3
+            events_log.rename(log_dir / "honeypot_events.json.1")
+            write_events(events_log, [make_event("2025-01-31 12:45:00")] * 6)
+            rotated = analyzer.query()[0]["attacks"]
+            print(f"  After rotation: {rotated} attacks")
+            assert rotated == 7
+            
+            # concurrent queries must not fold the same new lines in twice
+            write_events(events_log, [make_event("2025-01-31 13:00:00")] * 2000)
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(LogAnalyzer(log_dir=log_dir, load=False).query()))
+                for _ in range(concurrent)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            totals = [rows[0]["attacks"] for rows in results]
+            print(f"  Concurrent query totals: {totals}")
+            assert totals == [2007] * concurrent and analyzer.query()[0]["attacks"] == 2007
+    
+    finally:
+        if saved_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = saved_tz
+        time.tzset()
+        analyze_logs._utc_offsets.clear()
+
+
+def test_queries():
+    run_queries()
+
+
+def run_reload():
+    print(f"\n{'='*60}")
+    print("Testing config reload and listener handoff...")
+    print(f"{'='*60}")
+    
+    from honeypot import HoneyPot, load_config
+    
+    def free_port():
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            return probe.getsockname()[1]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        ssh_port, ftp_port, new_port = free_port(), free_port(), free_port()
+        honeypot = HoneyPot(log_dir=tmp, drain_timeout=1)
+        try:
+            honeypot.apply_config({"services": [
+                {"type": "ssh", "port": ssh_port},
+                {"type": "ftp", "port": ftp_port}
+            ]})
+            ssh_listener = honeypot.services[0].server
+            
+            honeypot.apply_config({"services": [
+                {"type": "ssh", "port": ssh_port, "banner": "SSH-2.0-OpenSSH_7.4"},
+                {"type": "telnet", "port": new_port}
+            ]})
+            
+            kept = honeypot.services[0].server is ssh_listener
+            print(f"  SSH listener kept: {kept}")
+            assert kept, "unchanged SSH listener was reopened"
+            
+            sock = socket.create_connection(('127.0.0.1', ssh_port), timeout=5)
+            banner = sock.recv(1024)
+            sock.close()
+            print(f"  New SSH banner: {banner.decode('utf-8', errors='ignore').strip()}")
+            assert banner.startswith(b"SSH-2.0-OpenSSH_7.4")
+            
+            sock = socket.create_connection(('127.0.0.1', new_port), timeout=5)
+            prompt = sock.recv(1024)
+            sock.close()
+            print(f"  Telnet prompt on new port: {prompt.decode('utf-8', errors='ignore').strip()}")
+            assert b"login:" in prompt
+            
+            try:
+                socket.create_connection(('127.0.0.1', ftp_port), timeout=1).close()
+                ftp_closed = False
+            except OSError:
+                ftp_closed = True
+            print(f"  Removed FTP listener closed: {ftp_closed}")
+            assert ftp_closed, "removed FTP listener still accepts"
+            
+            # malformed files are rejected on SIGHUP without touching the running services
+            config_path = Path(tmp) / "honeypot.json"
+            honeypot.config_path = config_path
+            listeners = [service.server for service in honeypot.services]
+            for malformed in (
+                [1],
+                {"services": [1]},
+                {"services": [{"type": "ssh", "port": ssh_port, "timeout": "30"}]},
+                {"services": [{"type": "ssh", "port": ssh_port, "max_connections": True}]},
+                {"services": [{"type": "ssh", "port": ssh_port, "banner": None}]},
+                {"services": [{"type": "ssh", "port": ssh_port}], "drain_timeout": -1},
+                {"services": [{"type": ["ssh"], "port": ssh_port}]},
+                {"services": [{"type": "ssh", "port": ssh_port}], "log_dir": 5}
+            ):
+                config_path.write_text(json.dumps(malformed))
+                # every validation failure is a ValueError, so main() reports it as a usage error
+                try:
+                    load_config(config_path)
+                except ValueError:
+                    pass
+                else:
+                    raise AssertionError(f"load_config accepted {malformed!r}")
+                honeypot.reload_config()
+            rejected = [service.server for service in honeypot.services] == listeners
+            print(f"  Malformed configs rejected: {rejected}")
+            assert rejected, "a malformed config changed the running services"
+            
+            # a per-connection setup failure is logged and the listener keeps accepting
+            honeypot.services[0].timeout = float("nan")
+            socket.create_connection(('127.0.0.1', ssh_port), timeout=5).close()
+            honeypot.services[0].timeout = 60
+            sock = socket.create_connection(('127.0.0.1', ssh_port), timeout=5)
+            survived = sock.recv(1024).startswith(b"SSH-2.0-")
+            sock.close()
+            print(f"  Listener survived a failed connection setup: {survived}")
+            assert survived, "listener died after a failed connection setup"
+        
+        finally:
+            honeypot.shutdown()
+
+
+def test_reload():
+    run_reload()
+
+
+def run_profiling():
+    print(f"\n{'='*60}")
+    print("Testing stage timing, stack sampling and the control thread...")
+    print(f"{'='*60}")
+    
+    import re
+    from honeypot import HoneyPot, StageTimer, StackSampler
+    
+    timer = StageTimer()
+    timer.stop("log", "write", timer.start())
+    assert not timer.stats, "a disabled timer recorded a stage"
+    
+    assert timer.toggle()
+    for _ in range(2):
+        started = timer.start()
+        time.sleep(0.001)
+        timer.stop("log", "write", started)
+    assert not timer.toggle()
+    report = timer.report().splitlines()
+    print("  " + "\n  ".join(report))
+    stage, count, total_ms = report[1].split()[:3]
+    assert stage == "log.write" and int(count) == 2 and float(total_ms) >= 2
+    
+    # turning timing back on starts a fresh report
+    assert timer.toggle() and not timer.stats
+    timer.toggle()
+    
+    def busy_for_sampler(until):
+        while time.monotonic() < until:
+            sum(range(1000))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        sampler = StackSampler(interval=0.001)
+        busy = threading.Thread(target=busy_for_sampler, args=(time.monotonic() + 0.3,))
+        sampler.start()
+        busy.start()
+        busy.join()
+        output_path = Path(tmp) / "profile.folded"
+        samples = sampler.stop(output_path)
+        
+        lines = output_path.read_text(encoding="utf-8").splitlines()
+        print(f"  Sampler: {samples} samples in {len(lines)} stacks")
+        frame = re.compile(r"^\S+ \([^();]+:\d+\)$")
+        total = 0
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert all(frame.match(name) for name in stack.split(";")), f"bad collapsed stack: {line!r}"
+            total += int(count)
+        assert samples > 0 and total == samples
+        assert any(";busy_for_sampler (test_honeypot.py:" in line for line in lines)
+        
+        # control actions run off the main thread, survive a failing action and stop with shutdown()
+        honeypot = HoneyPot(log_dir=tmp, drain_timeout=1)
+        ran_on = []
+        done = threading.Event()
+        
+        def failing_action():
+            raise RuntimeError("boom")
+        
+        def recording_action():
+            ran_on.append(threading.current_thread())
+            done.set()
+        
+        runner = threading.Thread(target=honeypot.start)
+        runner.start()
+        while honeypot.control_thread is None:
+            time.sleep(0.01)
+        honeypot.control.put(failing_action)
+        honeypot.control.put(recording_action)
+        assert done.wait(5), "queued control action never ran"
+        honeypot.stop()
+        runner.join(10)
+        
+        print(f"  Control action ran on: {ran_on[0].name}")
+        assert ran_on == [honeypot.control_thread]
+        assert not runner.is_alive() and not honeypot.control_thread.is_alive()
+        assert "Control action failing_action failed: boom" in (Path(tmp) / "honeypot_main.log").read_text(encoding="utf-8")
+
+
+def test_profiling():
+    run_profiling()
+
+
 def main():
     print("\n" + "="*60)
     print("HoneyPot Test Tool")
@@ -147,7 +732,14 @@ def main():
         "SSH": test_ssh(),
         "FTP": test_ftp(),
         "HTTP": test_http(),
-        "Telnet": test_telnet()
+        "Telnet": test_telnet(),
+        "Sessions": check("Session", run_sessions),
+        "Shipping": check("Shipping", run_shipping),
+        "Collector": check("Collector rate", run_collector_rate),
+        "Export": check("Export", run_export),
+        "Queries": check("Query", run_queries),
+        "Reload": check("Reload", run_reload),
+        "Profiling": check("Profiling", run_profiling)
     }
     
     print(f"\n{'='*60}")